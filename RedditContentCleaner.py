@@ -1,25 +1,68 @@
 import praw
-import datetime
-import pytz
-import random
+import sys
 import time
+import argparse
 import logging
-from typing import Optional, List, Dict, Iterator
+from typing import ClassVar, Optional, List, Dict
 import json
 import re
 import os
+import atexit
+import functools
+import itertools
+import shutil
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from urllib.parse import urlparse
 from tqdm import tqdm
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class RateLimiter:
+    """Spaces out calls so that at most `calls_per_minute` start in any minute, across threads"""
+
+    def __init__(self, calls_per_minute: float):
+        self.interval = 60.0 / calls_per_minute
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+def _cancels_pending_deletes(method):
+    """Cancel queued edits/deletes if a remove_* command is interrupted (e.g. by Ctrl-C)"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        except BaseException:
+            self._cancel_pending_deletes()
+            # Drop whatever was deleted before the interruption from the cached listings
+            self._prune_cache()
+            raise
+    return wrapper
+
 class RedditContentCleaner:
+    _MEDIA_EXTS: ClassVar[frozenset] = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.mp4'})
+
     def __init__(self, credentials_file: str = "credentials.txt"):
         # Set up logging
         logging.basicConfig(
             level=logging.INFO,
             format='%(asctime)s - %(levelname)s - %(message)s',
             handlers=[
-                logging.FileHandler('content_cleaner.log'),
+                logging.FileHandler('content_cleaner.log', delay=True),
                 logging.StreamHandler()
             ]
         )
@@ -29,327 +72,553 @@ class RedditContentCleaner:
         self.media_dir = 'post_media'
         os.makedirs(self.media_dir, exist_ok=True)
 
-        # Initialize Reddit instance
-        self.credentials = self._load_credentials(credentials_file)
-        self.reddit = praw.Reddit(
-            client_id=self.credentials['client_id'],
-            client_secret=self.credentials['client_secret'],
-            username=self.credentials['username'],
-            password=self.credentials['password'],
-            user_agent="Content Cleaner v1.1.1"
+        # Media downloads run in the background so they don't block edit/delete.
+        # Concurrency per CDN host is capped separately from the pool size.
+        self._media_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="media")
+        self._media_futures: List[Future] = []
+        self._media_by_post: Dict[str, Future] = {}
+        self._host_limit = 8
+        self._host_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_semaphores_lock = threading.Lock()
+
+        # Reuse connections to the media CDNs across downloads
+        self._http = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504])
         )
+        self._http.mount('https://', adapter)
+        self._http.mount('http://', adapter)
+
+        # Initialize the Reddit instance used for listings on the main thread.
+        # Edits and deletes get separate instances below, since PRAW isn't thread-safe.
+        self.credentials = self._load_credentials(credentials_file)
+        self.reddit = self._new_reddit(self.credentials[0])
+        self._me = self.reddit.user.me()
+
+        # Listings are fetched once per session and filtered in memory by each command
+        self._comments_cache: Optional[List] = None
+        self._posts_cache: Optional[List] = None
+        self._deleted_ids = set()
 
         # Load configuration
         self.config = self._load_config()
-
-    def _load_credentials(self, file_path: str) -> Dict[str, str]:
+        self._compile_exclusions()
+
+        # One edit/delete worker per registered app, each only ever using its own Reddit
+        # instance; items are handed to the workers in turn. Reddit's limits apply to the
+        # account, so every worker shares a single request budget.
+        self._rate_limiter = RateLimiter(self.config['requests_per_minute'])
+        self._delete_workers = [
+            (self._new_reddit(creds), ThreadPoolExecutor(max_workers=1, thread_name_prefix="delete"))
+            for creds in self.credentials
+        ]
+        self._next_delete_worker = itertools.cycle(self._delete_workers)
+        self._delete_futures: List[Future] = []
+        # Only hand out as many items as there are workers, so an abort loses at most that many
+        self._delete_slots = threading.BoundedSemaphore(len(self._delete_workers))
+
+        # Keep the backup file open for the whole session instead of reopening it per item
+        self._backup_file = None
+        if self.config['backup_enabled']:
+            self._backup_file = open('deleted_content.jsonl', 'ab', buffering=65536)
+            atexit.register(self._backup_file.close)
+        # A single writer thread keeps backup entries in order without locking the file
+        self._backup_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="backup")
+
+    def _load_credentials(self, file_path: str) -> List[Dict[str, str]]:
+        """Read one or more credential sets.
+
+        The file either holds a single set as four lines (client id, client secret,
+        username, password) or one `client_id:client_secret:username:password` row
+        per registered app. All rows must belong to the same Reddit account.
+        """
         try:
             with open(file_path, 'r') as f:
-                lines = f.readlines()
-            return {
-                'client_id': lines[0].strip(),
-                'client_secret': lines[1].strip(),
-                'username': lines[2].strip(),
-                'password': lines[3].strip()
-            }
+                lines = [line.strip() for line in f if line.strip()]
+            if not lines:
+                raise ValueError(f"{file_path} is empty")
+            keys = ('client_id', 'client_secret', 'username', 'password')
+            if ':' not in lines[0]:
+                if len(lines) < 4:
+                    raise ValueError("expected client id, client secret, username and password on four lines")
+                return [dict(zip(keys, lines[:4]))]
+
+            credentials = [dict(zip(keys, line.split(':', 3))) for line in lines]
+            if any(len(creds) != 4 for creds in credentials):
+                raise ValueError("each row must be client_id:client_secret:username:password")
+            if len({creds['username'].lower() for creds in credentials}) > 1:
+                raise ValueError("all credential rows must use the same Reddit account")
+            return credentials
         except Exception as e:
             self.logger.error(f"Error loading credentials: {str(e)}")
             raise
 
+    def _new_reddit(self, creds: Dict[str, str]) -> praw.Reddit:
+        return praw.Reddit(
+            client_id=creds['client_id'],
+            client_secret=creds['client_secret'],
+            username=creds['username'],
+            password=creds['password'],
+            user_agent="Content Cleaner v1.1.1"
+        )
+
     def _load_config(self) -> Dict:
+        # Default configuration; keys missing from an existing config.json fall back to these
+        defaults = {
+            'replacement_text': ".",
+            'requests_per_minute': 60,
+            'excluded_subs': [],
+            'excluded_keywords': [],
+            'backup_enabled': True,
+            'dry_run': False,
+            'banned_mode': False
+        }
         try:
             with open('config.json', 'r') as f:
-                return json.load(f)
+                config = {**defaults, **json.load(f)}
         except FileNotFoundError:
-            # Default configuration
-            config = {
-                'replacement_text': ".",
-                'min_delay': 6,
-                'max_delay': 8,
-                'excluded_subs': [],
-                'excluded_keywords': [],
-                'backup_enabled': True,
-                'dry_run': False,
-                'banned_mode': False
-            }
-            with open('config.json', 'w') as f:
-                json.dump(config, f, indent=4)
-            return config
-
-    def backup_content(self, content, content_type: str) -> None:
-        if self.config['backup_enabled']:
-            with open('deleted_content.txt', 'a', encoding='utf-8') as f:
-                f.write(f"Type: {content_type}\n")
-                f.write(f"Timestamp: {datetime.datetime.now(pytz.UTC)}\n")
-                f.write(f"Score: {content.score}\n")
-                f.write(f"Sub: {content.subreddit.display_name}\n")
-                if content_type == "post":
-                    f.write(f"Title: {content.title}\n")
-                    if hasattr(content, 'selftext'):
-                        f.write(f"Content: {content.selftext}\n")
-                    if hasattr(content, 'url'):
-                        f.write(f"URL: {content.url}\n")
-                else:
-                    f.write(f"Content: {content.body}\n")
-                f.write("-" * 50 + "\n")
+            self._write_config(defaults)
+            return defaults
+
+        rpm = config['requests_per_minute']
+        if isinstance(rpm, bool) or not isinstance(rpm, (int, float)) or rpm <= 0:
+            self.logger.warning(f"Invalid requests_per_minute {rpm!r}, using {defaults['requests_per_minute']}")
+            config['requests_per_minute'] = defaults['requests_per_minute']
+        return config
+
+    def _write_config(self, config: Dict) -> None:
+        """Write config.json atomically so a crash never leaves a half-written file"""
+        tmp_path = 'config.json.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(config, f, indent=4)
+        os.replace(tmp_path, 'config.json')
+
+    def set_option(self, key: str, value) -> None:
+        """Change a config value and save just that key to config.json.
+
+        The file is re-read first so hand edits made during the session are kept.
+        """
+        if self.config.get(key) == value:
+            return
+        self.config[key] = value
+        try:
+            with open('config.json', 'r') as f:
+                on_disk = json.load(f)
+        except FileNotFoundError:
+            on_disk = dict(self.config)
+        except ValueError as e:
+            self.logger.error(f"Not saving {key}: config.json is not valid JSON ({str(e)})")
+            return
+        on_disk[key] = value
+        self._write_config(on_disk)
+
+    def _compile_exclusions(self) -> None:
+        """Precompute the excluded subreddit set and a single keyword regex from the config"""
+        self._excluded_subs = {sub.lower() for sub in self.config['excluded_subs']}
+        keywords = self.config['excluded_keywords']
+        if keywords:
+            pattern = '|'.join(re.escape(keyword) for keyword in keywords)
+            self._excluded_keywords_re = re.compile(pattern, re.IGNORECASE)
+        else:
+            self._excluded_keywords_re = None
+
+    def backup_content(self, content, content_type: str, subreddit_name: Optional[str] = None) -> Optional[Future]:
+        """Queue a backup record for the content; the returned future fails if it couldn't be written"""
+        if self._backup_file is None:
+            return None
+        if subreddit_name is None:
+            subreddit_name = str(content.subreddit.display_name)
+
+        record = {
+            'type': content_type,
+            'id': content.fullname,
+            'timestamp': time.time(),
+            'score': content.score,
+            'subreddit': subreddit_name,
+        }
+        if content_type == "post":
+            record['title'] = content.title
+            if hasattr(content, 'selftext'):
+                record['content'] = content.selftext
+            if hasattr(content, 'url'):
+                record['url'] = content.url
+        else:
+            record['content'] = content.body
+
+        if orjson is not None:
+            line = orjson.dumps(record) + b"\n"
+        else:
+            line = json.dumps(record, ensure_ascii=False).encode('utf-8') + b"\n"
+
+        # The record is built here because edit() overwrites the text on the content object;
+        # only the file write happens in the background
+        return self._backup_pool.submit(self._write_backup, line)
+
+    def _write_backup(self, line: bytes) -> None:
+        # Flush each record so a write error surfaces before the item is deleted
+        try:
+            self._backup_file.write(line)
+            self._backup_file.flush()
+        except Exception as e:
+            self.logger.error(f"Error writing backup: {str(e)}")
+            raise
+
+    def _is_media_url(self, url: str) -> bool:
+        return os.path.splitext(urlparse(url).path)[1].lower() in self._MEDIA_EXTS
+
+    def _host_semaphore(self, url: str) -> threading.BoundedSemaphore:
+        """Get the semaphore limiting concurrent downloads from the URL's host"""
+        host = urlparse(url).netloc
+        with self._host_semaphores_lock:
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = threading.BoundedSemaphore(self._host_limit)
+            return self._host_semaphores[host]
 
     def download_media(self, post) -> None:
         try:
-            url = post.url.lower()
-            if any(url.endswith(ext) for ext in ['.jpg', '.jpeg', '.png', '.gif', '.mp4']):
+            url = post.url
+            if self._is_media_url(url):
                 filename = os.path.join(self.media_dir, os.path.basename(urlparse(url).path))
-                response = requests.get(url, stream=True)
-                response.raise_for_status()
-
-                with open(filename, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                self.logger.info(f"Downloaded media: {filename}")
+                with self._host_semaphore(url):
+                    with self._http.get(url, stream=True, timeout=30) as response:
+                        response.raise_for_status()
+
+                        # Let shutil copy the raw stream in 1 MiB blocks instead of looping in Python
+                        response.raw.decode_content = True
+                        with open(filename, 'wb', buffering=1 << 20) as f:
+                            shutil.copyfileobj(response.raw, f, length=1 << 20)
+                self.logger.debug("Downloaded media: %s", filename)
         except Exception as e:
             self.logger.error(f"Error downloading media: {str(e)}")
 
-    def should_exclude_content(self, content) -> bool:
-        if str(content.subreddit.display_name) in self.config['excluded_subs']:
+    def _queue_media_download(self, post) -> Optional[Future]:
+        """Schedule a media download on the background pool if the post links to media"""
+        if not self._is_media_url(post.url):
+            return None
+        future = self._media_pool.submit(self.download_media, post)
+        self._media_futures.append(future)
+        return future
+
+    def _prefetch_media(self, posts) -> None:
+        """Start the media downloads for every post a command is about to remove.
+
+        They are queued before any post is handed to the delete workers, so the
+        downloads run concurrently instead of one at a time alongside each delete.
+        """
+        if self.config['dry_run']:
+            return
+        for post in posts:
+            if post.fullname in self._media_by_post or self.should_exclude_content(post):
+                continue
+            future = self._queue_media_download(post)
+            if future is not None:
+                self._media_by_post[post.fullname] = future
+
+    def _all_comments(self) -> List:
+        """Get the user's comments, fetching the listing only on first use"""
+        if self._comments_cache is None:
+            print("Fetching comments...")
+            self._comments_cache = list(self._me.comments.new(limit=None))
+        return self._comments_cache
+
+    def _all_posts(self) -> List:
+        """Get the user's posts, fetching the listing only on first use"""
+        if self._posts_cache is None:
+            print("Fetching posts...")
+            self._posts_cache = list(self._me.submissions.new(limit=None))
+        return self._posts_cache
+
+    def refresh_cache(self) -> None:
+        """Forget the cached listings so the next command fetches them again"""
+        self._comments_cache = None
+        self._posts_cache = None
+        self._deleted_ids.clear()
+
+    def _prune_cache(self) -> None:
+        """Drop items deleted by the current command from the cached listings"""
+        if not self._deleted_ids:
+            return
+        if self._comments_cache is not None:
+            self._comments_cache = [c for c in self._comments_cache if c.fullname not in self._deleted_ids]
+        if self._posts_cache is not None:
+            self._posts_cache = [p for p in self._posts_cache if p.fullname not in self._deleted_ids]
+        self._deleted_ids.clear()
+
+    def _finish_command(self) -> None:
+        """Wait for background work started by the current command and tidy up after it"""
+        self._wait_for_deletes()
+        self._prune_cache()
+        if self._media_futures:
+            print(f"Waiting for {len(self._media_futures)} media downloads to finish...")
+            wait(self._media_futures)
+            self._media_futures.clear()
+        self._media_by_post.clear()
+        if self._backup_file is not None:
+            # Queued behind every pending write, so this also waits for them
+            self._backup_pool.submit(self._backup_file.flush).result()
+
+    def close(self) -> None:
+        """Wait for background work and release the HTTP session and backup file"""
+        self._finish_command()
+        for _, pool in self._delete_workers:
+            pool.shutdown(wait=True)
+        self._media_pool.shutdown(wait=True)
+        self._backup_pool.shutdown(wait=True)
+        self._http.close()
+        if self._backup_file is not None:
+            self._backup_file.close()
+
+    def should_exclude_content(self, content, subreddit_name: Optional[str] = None) -> bool:
+        if subreddit_name is None:
+            subreddit_name = str(content.subreddit.display_name)
+        if subreddit_name.lower() in self._excluded_subs:
             return True
 
+        if self._excluded_keywords_re is None:
+            return False
         content_text = content.selftext if hasattr(content, 'selftext') else content.body
-        for keyword in self.config['excluded_keywords']:
-            if keyword.lower() in content_text.lower():
-                return True
-
-        return False
-
-    def _count_items(self, iterator: Iterator) -> int:
-        """Count the total number of items in an iterator (consumes the iterator)"""
-        count = 0
-        for _ in iterator:
-            count += 1
-        return count
+        return self._excluded_keywords_re.search(content_text) is not None
 
-    def _get_comment_count(self) -> int:
-        """Get an approximate count of user's comments"""
+    def _edit_and_delete(self, content, content_type: str, subreddit_name: str,
+                         reddit: praw.Reddit, backup_future: Optional[Future] = None,
+                         media_future: Optional[Future] = None, progress_bar=None) -> None:
         try:
-            return self._count_items(self.reddit.user.me().comments.new(limit=None))
+            # Never edit or delete an item whose backup couldn't be written
+            if backup_future is not None and backup_future.exception() is not None:
+                self.logger.error(f"Backup failed, keeping {content_type} in r/{subreddit_name}")
+                return
+
+            # Re-bind the item to this worker's instance without fetching it again
+            if content_type == "comment":
+                target = reddit.comment(id=content.id)
+            else:
+                target = reddit.submission(id=content.id)
+
+            # Only edit if not in banned mode; posts are only edited when they have text
+            if not self.config['banned_mode'] and (content_type == "comment" or content.selftext):
+                self._rate_limiter.acquire()
+                target.edit(self.config['replacement_text'])
+            # Reddit-hosted media goes away with the post, so finish backing it up first
+            if media_future is not None:
+                media_future.result()
+            self._rate_limiter.acquire()
+            target.delete()
+            self._deleted_ids.add(content.fullname)
+            mode_str = " (banned mode)" if self.config['banned_mode'] else ""
+            self.logger.debug("Processed %s in r/%s%s", content_type, subreddit_name, mode_str)
         except Exception as e:
-            self.logger.error(f"Error counting comments: {str(e)}")
-            return 0
+            self.logger.error(f"Error processing {content_type}: {str(e)}")
+        finally:
+            self._delete_slots.release()
+        if progress_bar:
+            progress_bar.update(1)
+
+    def _cancel_pending_deletes(self) -> None:
+        """Cancel every edit/delete that hasn't started yet"""
+        for future in self._delete_futures:
+            if future.cancel():
+                self._delete_slots.release()
+        self._delete_futures.clear()
+        self._media_by_post.clear()
+
+    def _wait_for_deletes(self) -> None:
+        """Block until every edit/delete submitted by the current command has finished"""
+        if self._delete_futures:
+            wait(self._delete_futures)
+            self._delete_futures.clear()
+
+    def _process(self, content, content_type: str, progress_bar=None, subreddit_name: Optional[str] = None) -> None:
+        # Resolve the subreddit name once and reuse it for every check below
+        if subreddit_name is None:
+            subreddit_name = str(content.subreddit.display_name)
+        if self.should_exclude_content(content, subreddit_name):
+            if progress_bar:
+                progress_bar.update(1)
+            return
 
-    def _get_post_count(self) -> int:
-        """Get an approximate count of user's posts"""
+        if self.config['dry_run']:
+            # Nothing is deleted in a dry run, so skip the backup and media download
+            self.logger.info("Would remove %s in r/%s (dry run)", content_type, subreddit_name)
+            if progress_bar:
+                progress_bar.update(1)
+            return
+
+        media_future = None
         try:
-            return self._count_items(self.reddit.user.me().submissions.new(limit=None))
+            backup_future = self.backup_content(content, content_type, subreddit_name)
+
+            # Download media if present
+            if content_type == "post" and hasattr(content, 'url'):
+                media_future = self._media_by_post.pop(content.fullname, None) or self._queue_media_download(content)
         except Exception as e:
-            self.logger.error(f"Error counting posts: {str(e)}")
-            return 0
-
-    def process_comment(self, comment, progress_bar=None) -> None:
-        if not self.should_exclude_content(comment):
-            try:
-                self.backup_content(comment, "comment")
-                if not self.config['dry_run']:
-                    # Only edit comments if not in banned mode
-                    if not self.config['banned_mode']:
-                        comment.edit(self.config['replacement_text'])
-                    comment.delete()
-                    delay = random.uniform(self.config['min_delay'], self.config['max_delay'])
-                    time.sleep(delay)
-                mode_str = " (banned mode)" if self.config['banned_mode'] else ""
-                self.logger.info(f"Processed comment in r/{comment.subreddit.display_name}{mode_str}")
-                if progress_bar:
-                    progress_bar.update(1)
-            except Exception as e:
-                self.logger.error(f"Error processing comment: {str(e)}")
-                if progress_bar:
-                    progress_bar.update(1)
-
-    def process_post(self, post, progress_bar=None) -> None:
-        if not self.should_exclude_content(post):
-            try:
-                self.backup_content(post, "post")
-
-                # Download media if present
-                if hasattr(post, 'url'):
-                    self.download_media(post)
-
-                if not self.config['dry_run']:
-                    # Edit if it's a text post and not in banned mode
-                    if not self.config['banned_mode'] and hasattr(post, 'selftext') and post.selftext:
-                        post.edit(self.config['replacement_text'])
-
-                    post.delete()
-                    delay = random.uniform(self.config['min_delay'], self.config['max_delay'])
-                    time.sleep(delay)
-                mode_str = " (banned mode)" if self.config['banned_mode'] else ""
-                self.logger.info(f"Processed post in r/{post.subreddit.display_name}{mode_str}")
-                if progress_bar:
-                    progress_bar.update(1)
-            except Exception as e:
-                self.logger.error(f"Error processing post: {str(e)}")
-                if progress_bar:
-                    progress_bar.update(1)
+            self.logger.error(f"Error processing {content_type}: {str(e)}")
+            if progress_bar:
+                progress_bar.update(1)
+            return
+
+        self._delete_slots.acquire()
+        reddit, pool = next(self._next_delete_worker)
+        self._delete_futures.append(
+            pool.submit(self._edit_and_delete, content, content_type, subreddit_name,
+                        reddit, backup_future, media_future, progress_bar)
+        )
+
+    def process_comment(self, comment, progress_bar=None, subreddit_name: Optional[str] = None) -> None:
+        self._process(comment, "comment", progress_bar, subreddit_name)
+
+    def process_post(self, post, progress_bar=None, subreddit_name: Optional[str] = None) -> None:
+        self._process(post, "post", progress_bar, subreddit_name)
 
+    @_cancels_pending_deletes
     def remove_old_comments(self, days: int) -> None:
-        cutoff = datetime.datetime.now(pytz.UTC) - datetime.timedelta(days=days)
+        # created_utc is a Unix timestamp, so compare against one directly
+        cutoff_ts = time.time() - days * 86400
 
-        # First count approximately how many comments we'll process
-        print("Estimating comment count...")
-        total_comments = self._get_comment_count()
         processed = 0
 
-        print(f"Processing approximately {total_comments} comments...")
-        with tqdm(total=total_comments, desc="Removing old comments", unit="comment") as pbar:
-            for comment in self.reddit.user.me().comments.new(limit=None):
-                comment_time = datetime.datetime.fromtimestamp(comment.created_utc, pytz.UTC)
-                if comment_time < cutoff:
+        comments = self._all_comments()
+        with tqdm(total=len(comments), desc="Removing old comments", unit="comment") as pbar:
+            for comment in comments:
+                if comment.created_utc < cutoff_ts:
                     self.process_comment(comment, pbar)
                 else:
                     pbar.update(1)
                 processed += 1
+            self._wait_for_deletes()
 
+        self._finish_command()
         print(f"Completed! Processed {processed} comments.")
 
+    @_cancels_pending_deletes
     def remove_negative_karma(self) -> None:
-        # First count approximately how many comments we'll process
-        print("Estimating comment count...")
-        total_comments = self._get_comment_count()
         processed = 0
         removed = 0
 
-        print(f"Processing approximately {total_comments} comments...")
-        with tqdm(total=total_comments, desc="Removing negative karma comments", unit="comment") as pbar:
-            for comment in self.reddit.user.me().comments.new(limit=None):
+        comments = self._all_comments()
+        with tqdm(total=len(comments), desc="Removing negative karma comments", unit="comment") as pbar:
+            for comment in comments:
                 if comment.score < 0:
                     self.process_comment(comment, pbar)
                     removed += 1
                 else:
                     pbar.update(1)
                 processed += 1
+            self._wait_for_deletes()
 
+        self._finish_command()
         print(f"Completed! Processed {processed} comments, removed {removed} comments.")
 
+    @_cancels_pending_deletes
     def remove_low_engagement(self) -> None:
-        # First count approximately how many comments we'll process
-        print("Estimating comment count...")
-        total_comments = self._get_comment_count()
         processed = 0
         removed = 0
 
-        print(f"Processing approximately {total_comments} comments...")
-        with tqdm(total=total_comments, desc="Removing low engagement comments", unit="comment") as pbar:
-            for comment in self.reddit.user.me().comments.new(limit=None):
+        comments = self._all_comments()
+        with tqdm(total=len(comments), desc="Removing low engagement comments", unit="comment") as pbar:
+            for comment in comments:
                 if comment.score <= 1 and len(comment.replies) == 0:
                     self.process_comment(comment, pbar)
                     removed += 1
                 else:
                     pbar.update(1)
                 processed += 1
+            self._wait_for_deletes()
 
+        self._finish_command()
         print(f"Completed! Processed {processed} comments, removed {removed} comments.")
 
+    @_cancels_pending_deletes
     def remove_all_posts(self) -> None:
-        # First count approximately how many posts we'll process
-        print("Estimating post count...")
-        total_posts = self._get_post_count()
-        processed = 0
-
-        print(f"Processing approximately {total_posts} posts...")
-        with tqdm(total=total_posts, desc="Removing all posts", unit="post") as pbar:
-            for post in self.reddit.user.me().submissions.new(limit=None):
+        posts = self._all_posts()
+        self._prefetch_media(posts)
+        with tqdm(total=len(posts), desc="Removing all posts", unit="post") as pbar:
+            for post in posts:
                 self.process_post(post, pbar)
-                processed += 1
+            self._wait_for_deletes()
 
-        print(f"Completed! Removed {processed} posts.")
+        self._finish_command()
+        print(f"Completed! Removed {len(posts)} posts.")
 
+    @_cancels_pending_deletes
     def remove_old_posts(self, days: int) -> None:
-        cutoff = datetime.datetime.now(pytz.UTC) - datetime.timedelta(days=days)
-
-        # First count approximately how many posts we'll process
-        print("Estimating post count...")
-        total_posts = self._get_post_count()
-        processed = 0
-        removed = 0
-
-        print(f"Processing approximately {total_posts} posts...")
-        with tqdm(total=total_posts, desc="Removing old posts", unit="post") as pbar:
-            for post in self.reddit.user.me().submissions.new(limit=None):
-                post_time = datetime.datetime.fromtimestamp(post.created_utc, pytz.UTC)
-                if post_time < cutoff:
-                    self.process_post(post, pbar)
-                    removed += 1
-                else:
-                    pbar.update(1)
-                processed += 1
+        # created_utc is a Unix timestamp, so compare against one directly
+        cutoff_ts = time.time() - days * 86400
+
+        posts = self._all_posts()
+        matching = [post for post in posts if post.created_utc < cutoff_ts]
+        self._prefetch_media(matching)
+        with tqdm(total=len(posts), desc="Removing old posts", unit="post") as pbar:
+            pbar.update(len(posts) - len(matching))
+            for post in matching:
+                self.process_post(post, pbar)
+            self._wait_for_deletes()
 
-        print(f"Completed! Processed {processed} posts, removed {removed} posts.")
+        self._finish_command()
+        print(f"Completed! Processed {len(posts)} posts, removed {len(matching)} posts.")
 
+    @_cancels_pending_deletes
     def remove_low_karma_posts(self, threshold: int) -> None:
-        # First count approximately how many posts we'll process
-        print("Estimating post count...")
-        total_posts = self._get_post_count()
-        processed = 0
-        removed = 0
-
-        print(f"Processing approximately {total_posts} posts...")
-        with tqdm(total=total_posts, desc="Removing low karma posts", unit="post") as pbar:
-            for post in self.reddit.user.me().submissions.new(limit=None):
-                if post.score < threshold:
-                    self.process_post(post, pbar)
-                    removed += 1
-                else:
-                    pbar.update(1)
-                processed += 1
+        posts = self._all_posts()
+        matching = [post for post in posts if post.score < threshold]
+        self._prefetch_media(matching)
+        with tqdm(total=len(posts), desc="Removing low karma posts", unit="post") as pbar:
+            pbar.update(len(posts) - len(matching))
+            for post in matching:
+                self.process_post(post, pbar)
+            self._wait_for_deletes()
 
-        print(f"Completed! Processed {processed} posts, removed {removed} posts.")
+        self._finish_command()
+        print(f"Completed! Processed {len(posts)} posts, removed {len(matching)} posts.")
 
+    @_cancels_pending_deletes
     def remove_by_subreddit(self, subreddit_name: str) -> None:
-        # First count approximately how many items we'll process
-        print("Estimating content count...")
-        total_comments = self._get_comment_count()
-        total_posts = self._get_post_count()
-        total_items = total_comments + total_posts
+        target = subreddit_name.lower()
         processed_comments = 0
-        processed_posts = 0
         removed_comments = 0
-        removed_posts = 0
 
-        print(f"Processing approximately {total_items} items...")
-        with tqdm(total=total_items, desc=f"Removing content from r/{subreddit_name}", unit="item") as pbar:
+        comments = self._all_comments()
+        posts = self._all_posts()
+        post_subs = ((post, str(post.subreddit.display_name)) for post in posts)
+        matching_posts = [(post, post_sub) for post, post_sub in post_subs if post_sub.lower() == target]
+        self._prefetch_media(post for post, _ in matching_posts)
+        with tqdm(total=len(comments) + len(posts), desc=f"Removing content from r/{subreddit_name}", unit="item") as pbar:
             # Process comments first
-            for comment in self.reddit.user.me().comments.new(limit=None):
-                if str(comment.subreddit.display_name).lower() == subreddit_name.lower():
-                    self.process_comment(comment, pbar)
+            for comment in comments:
+                comment_sub = str(comment.subreddit.display_name)
+                if comment_sub.lower() == target:
+                    self.process_comment(comment, pbar, comment_sub)
                     removed_comments += 1
                 else:
                     pbar.update(1)
                 processed_comments += 1
 
             # Then process posts
-            for post in self.reddit.user.me().submissions.new(limit=None):
-                if str(post.subreddit.display_name).lower() == subreddit_name.lower():
-                    self.process_post(post, pbar)
-                    removed_posts += 1
-                else:
-                    pbar.update(1)
-                processed_posts += 1
+            pbar.update(len(posts) - len(matching_posts))
+            for post, post_sub in matching_posts:
+                self.process_post(post, pbar, post_sub)
+            self._wait_for_deletes()
 
-        print(f"Completed! Processed {processed_comments} comments and {processed_posts} posts.")
-        print(f"Removed {removed_comments} comments and {removed_posts} posts from r/{subreddit_name}.")
+        self._finish_command()
+        print(f"Completed! Processed {processed_comments} comments and {len(posts)} posts.")
+        print(f"Removed {removed_comments} comments and {len(matching_posts)} posts from r/{subreddit_name}.")
 
+    @_cancels_pending_deletes
     def remove_by_keyword(self, keyword: str) -> None:
-        # First count approximately how many items we'll process
-        print("Estimating content count...")
-        total_comments = self._get_comment_count()
-        total_posts = self._get_post_count()
-        total_items = total_comments + total_posts
         processed_comments = 0
-        processed_posts = 0
         removed_comments = 0
-        removed_posts = 0
 
-        print(f"Processing approximately {total_items} items...")
-        with tqdm(total=total_items, desc=f"Removing content with keyword '{keyword}'", unit="item") as pbar:
+        comments = self._all_comments()
+        posts = self._all_posts()
+        matching_posts = [
+            post for post in posts
+            if keyword.lower() in post.title.lower() or (hasattr(post, 'selftext') and keyword.lower() in post.selftext.lower())
+        ]
+        self._prefetch_media(matching_posts)
+        with tqdm(total=len(comments) + len(posts), desc=f"Removing content with keyword '{keyword}'", unit="item") as pbar:
             # Process comments first
-            for comment in self.reddit.user.me().comments.new(limit=None):
+            for comment in comments:
                 if keyword.lower() in comment.body.lower():
                     self.process_comment(comment, pbar)
                     removed_comments += 1
@@ -358,18 +627,89 @@ class RedditContentCleaner:
                 processed_comments += 1
 
             # Then process posts
-            for post in self.reddit.user.me().submissions.new(limit=None):
-                if keyword.lower() in post.title.lower() or (hasattr(post, 'selftext') and keyword.lower() in post.selftext.lower()):
-                    self.process_post(post, pbar)
-                    removed_posts += 1
-                else:
-                    pbar.update(1)
-                processed_posts += 1
+            pbar.update(len(posts) - len(matching_posts))
+            for post in matching_posts:
+                self.process_post(post, pbar)
+            self._wait_for_deletes()
+
+        self._finish_command()
+        print(f"Completed! Processed {processed_comments} comments and {len(posts)} posts.")
+        print(f"Removed {removed_comments} comments and {len(matching_posts)} posts containing '{keyword}'.")
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Reddit Content Cleaner batch mode. Runs every selected operation in order "
+                    "against one Reddit session. Run without arguments for the interactive menu."
+    )
+    comments = parser.add_argument_group("comment options")
+    comments.add_argument("--old-comments", type=int, metavar="DAYS", help="remove comments older than DAYS days")
+    comments.add_argument("--negative-karma", action="store_true", help="remove comments with negative karma")
+    comments.add_argument("--low-engagement", action="store_true", help="remove comments with 1 karma and no replies")
+
+    posts = parser.add_argument_group("post options")
+    posts.add_argument("--all-posts", action="store_true", help="remove all posts")
+    posts.add_argument("--old-posts", type=int, metavar="DAYS", help="remove posts older than DAYS days")
+    posts.add_argument("--low-karma-posts", type=int, metavar="THRESHOLD", help="remove posts under THRESHOLD upvotes")
+
+    general = parser.add_argument_group("general options")
+    general.add_argument("--subreddit", action="append", default=[], metavar="NAME",
+                         help="remove content from subreddit NAME (can be repeated)")
+    general.add_argument("--keyword", action="append", default=[], metavar="KEYWORD",
+                         help="remove content containing KEYWORD (can be repeated)")
+    general.add_argument("--dry-run", action="store_true", help="enable dry run for this invocation only")
+    general.add_argument("--banned-mode", action="store_true", help="enable banned mode for this invocation only")
+    general.add_argument("-y", "--yes", action="store_true", help="don't ask for confirmation before removing all posts")
+    return parser
+
+def run_batch(argv: List[str]) -> None:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    operations = []
+    if args.old_comments is not None:
+        operations.append(lambda c: c.remove_old_comments(args.old_comments))
+    if args.negative_karma:
+        operations.append(lambda c: c.remove_negative_karma())
+    if args.low_engagement:
+        operations.append(lambda c: c.remove_low_engagement())
+    if args.all_posts:
+        confirm = 'y' if args.yes else input("Are you sure you want to remove ALL posts? (y/n): ")
+        if confirm.lower() == 'y':
+            operations.append(lambda c: c.remove_all_posts())
+        else:
+            print("Skipping removal of all posts.")
+    if args.old_posts is not None:
+        operations.append(lambda c: c.remove_old_posts(args.old_posts))
+    if args.low_karma_posts is not None:
+        operations.append(lambda c: c.remove_low_karma_posts(args.low_karma_posts))
+    for subreddit in args.subreddit:
+        operations.append(lambda c, subreddit=subreddit: c.remove_by_subreddit(subreddit))
+    for keyword in args.keyword:
+        operations.append(lambda c, keyword=keyword: c.remove_by_keyword(keyword))
+
+    if not operations:
+        if args.all_posts:
+            return
+        parser.error("no operation selected")
 
-        print(f"Completed! Processed {processed_comments} comments and {processed_posts} posts.")
-        print(f"Removed {removed_comments} comments and {removed_posts} posts containing '{keyword}'.")
+    cleaner = RedditContentCleaner()
+    # Command line overrides apply to this run only and are not saved to config.json
+    if args.dry_run:
+        cleaner.config['dry_run'] = True
+    if args.banned_mode:
+        cleaner.config['banned_mode'] = True
+
+    try:
+        for operation in operations:
+            operation(cleaner)
+    finally:
+        cleaner.close()
 
 def main():
+    if len(sys.argv) > 1:
+        run_batch(sys.argv[1:])
+        return
+
     cleaner = RedditContentCleaner()
 
     # Check if tqdm is installed, if not provide installation instructions
@@ -408,9 +748,10 @@ def main():
         print("  9. Edit configuration")
         print(" 10. Enable/Disable dry run")
         print(" 11. Toggle banned mode")
-        print(" 12. Quit")
+        print(" 12. Refresh cached comments and posts")
+        print(" 13. Quit")
 
-        choice = input("\n👉 Enter your choice (1-12): ")
+        choice = input("\n👉 Enter your choice (1-13): ")
 
         try:
             if choice == "1":
@@ -444,26 +785,24 @@ def main():
                 print("\nEdit config.json file to make changes")
                 input("Press Enter to continue...")
             elif choice == "10":
-                cleaner.config['dry_run'] = not cleaner.config['dry_run']
+                cleaner.set_option('dry_run', not cleaner.config['dry_run'])
                 status = "ENABLED" if cleaner.config['dry_run'] else "DISABLED"
                 print(f"Dry run {status}")
-                # Save the updated config
-                with open('config.json', 'w') as f:
-                    json.dump(cleaner.config, f, indent=4)
             elif choice == "11":
-                cleaner.config['banned_mode'] = not cleaner.config['banned_mode']
+                cleaner.set_option('banned_mode', not cleaner.config['banned_mode'])
                 status = "ENABLED" if cleaner.config['banned_mode'] else "DISABLED"
                 print(f"Banned mode {status}")
                 if cleaner.config['banned_mode']:
                     print("Comments and posts will be deleted without editing first")
-                # Save the updated config
-                with open('config.json', 'w') as f:
-                    json.dump(cleaner.config, f, indent=4)
             elif choice == "12":
+                cleaner.refresh_cache()
+                print("Cached comments and posts cleared; they will be fetched again on the next operation")
+            elif choice == "13":
+                cleaner.close()
                 print("Thank you for using Reddit Content Cleaner!")
                 break
             else:
-                print("Invalid choice. Please enter a number between 1 and 12.")
+                print("Invalid choice. Please enter a number between 1 and 13.")
         except ValueError as e:
             print(f"Invalid input: {str(e)}")
         except Exception as e: